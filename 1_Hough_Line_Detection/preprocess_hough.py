@@ -8,10 +8,113 @@
 import cv2
 import numpy as np
 import argparse
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Tuple, List, Optional
 
 
+def _cuda_available() -> bool:
+    """檢查 OpenCV 是否以 CUDA 編譯且有可用的 GPU"""
+    try:
+        return hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except cv2.error:
+        return False
+
+
+USE_CUDA = _cuda_available()
+
+# 沒有 CUDA 時，若有 OpenCL 裝置則以 UMat (T-API) 執行 Canny
+USE_OPENCL = not USE_CUDA and cv2.ocl.haveOpenCL()
+
+# 判斷旋轉方向時的最大邊長，較大的圖像先縮小再做 Canny / 霍夫檢測
+# （線段方向不受等比縮放影響）
+LINE_DETECTION_MAX_SIDE = 1024
+
+# CUDA 檢測器只建立一次，之後重複使用
+_cuda_canny = None
+_cuda_hough = None
+
+# 圖像增強用的 CLAHE 物件與銳化核，模組載入時建立一次
+CLAHE = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                           [-1,  9, -1],
+                           [-1, -1, -1]], dtype=np.float32)
+
+# 降噪方法：bilateral（雙邊濾波，預設）、nlm（原本的 NL-means）、gpu（CUDA NL-means）
+DENOISE_METHODS = ('bilateral', 'nlm', 'gpu')
+
+# 批次模式處理的圖像副檔名（不分大小寫）
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+def detect_line_segments(gray: np.ndarray, max_side: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    Canny 邊緣檢測 + 霍夫直線檢測（有 CUDA 或 OpenCL 時在 GPU 上執行）
+    
+    Args:
+        gray: 灰階圖像
+        max_side: 檢測前將圖像縮小到此最大邊長，None 表示使用原始解析度
+    
+    返回:
+        lines: 與 cv2.HoughLinesP 相同格式的線段 (N, 1, 4)，座標為原圖座標，
+               未檢測到時為 None
+    """
+    global _cuda_canny, _cuda_hough
+    
+    # 大圖先縮小，霍夫參數按比例調整
+    h, w = gray.shape[:2]
+    scale = 1.0 if max_side is None else min(1.0, max_side / max(h, w))
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    threshold = max(1, round(100 * scale))
+    min_line_length = max(1, round(50 * scale))
+    max_line_gap = max(1, round(10 * scale))
+    
+    if USE_CUDA:
+        if _cuda_canny is None:
+            _cuda_canny = cv2.cuda.createCannyEdgeDetector(50, 150, 3)
+            _cuda_hough = cv2.cuda.createHoughSegmentDetector(
+                1, np.pi/180, min_line_length, max_line_gap, 4096, threshold)
+        
+        # 檢測器重複使用，但霍夫參數隨縮放比例而變，每次都要重新設定
+        _cuda_hough.setThreshold(threshold)
+        _cuda_hough.setMinLineLength(min_line_length)
+        _cuda_hough.setMaxLineGap(max_line_gap)
+        # CUDA 版需指定線段數上限；依圖像大小設定（每條線段至少 min_line_length 個邊緣點），
+        # 避免密集頁面被截斷。注意 CUDA 版並非 CPU 的機率式霍夫演算法，線段數本來就會與 CPU 不同
+        max_lines = max(4096, gray.size // min_line_length)
+        _cuda_hough.setMaxLines(max_lines)
+        
+        # 上傳一次，邊緣圖留在 GPU 上直接交給霍夫檢測，只下載線段結果
+        gpu_gray = cv2.cuda_GpuMat()
+        gpu_gray.upload(gray)
+        gpu_edges = _cuda_canny.detect(gpu_gray)
+        gpu_lines = _cuda_hough.detect(gpu_edges)
+        if gpu_lines.empty():
+            return None
+        lines = gpu_lines.download().reshape(-1, 1, 4)
+    else:
+        # 邊緣檢測（OpenCL：以 UMat 傳入，在 GPU 上執行）
+        if USE_OPENCL:
+            edges = cv2.Canny(cv2.UMat(gray), 50, 150, apertureSize=3).get()
+        else:
+            edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+        
+        # 霍夫直線檢測一律在 CPU 上以 ndarray 執行：
+        # UMat 輸入會改走 OpenCL 版（以累加器取線段、另有線段數上限），並非同一演算法，
+        # 線段數量會影響方向評分與眾數角度
+        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=threshold,
+                                minLineLength=min_line_length, maxLineGap=max_line_gap)
+    
+    # 座標換算回原圖
+    if lines is not None and scale < 1.0:
+        lines = np.round(lines / scale).astype(np.int32)
+    
+    return lines
+
+
 def detect_angle_by_lines(image: np.ndarray, verbose: bool = False) -> Tuple[int, float]:
     """
     使用霍夫直線檢測來判斷圖像需要旋轉的角度
@@ -20,56 +123,44 @@ def detect_angle_by_lines(image: np.ndarray, verbose: bool = False) -> Tuple[int
         rotation_angle: 需要旋轉的角度 (0, 90, 180, 270)
         confidence: 置信度分數
     """
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image.copy()
-    
-    # 邊緣檢測
-    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
     
-    # 霍夫直線檢測
-    lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=100, minLineLength=50, maxLineGap=10)
+    # 邊緣檢測 + 霍夫直線檢測（只需判斷方向，使用縮小後的圖像）
+    lines = detect_line_segments(gray, max_side=LINE_DETECTION_MAX_SIDE)
     
     if lines is None:
         if verbose:
             print("  未檢測到線條，返回 0° 旋轉")
         return 0, 0.0
     
-    # 統計各方向的線條數量
-    angle_counts = {
-        0: 0,    # 水平線
-        45: 0,   # 45度斜線
-        90: 0,   # 垂直線
-        135: 0   # 135度斜線
-    }
-    
-    for line in lines:
-        x1, y1, x2, y2 = line[0]
-        
-        # 計算線條角度
-        angle = np.abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
-        
-        # 分類線條方向
-        if angle < 22.5 or angle > 157.5:
-            angle_counts[0] += 1
-        elif 22.5 <= angle < 67.5:
-            angle_counts[45] += 1
-        elif 67.5 <= angle < 112.5:
-            angle_counts[90] += 1
-        elif 112.5 <= angle < 157.5:
-            angle_counts[135] += 1
+    # 統計各方向的線條數量（一次向量化計算所有線段角度）
+    # 以 45° 為一區間、±22.5° 為邊界分為四類：0=水平線, 1=45°, 2=垂直線, 3=135°
+    segments = lines.reshape(-1, 4)
+    angles = np.abs(np.arctan2(segments[:, 3] - segments[:, 1],
+                               segments[:, 2] - segments[:, 0]) * 180 / np.pi)
+    # 角度非負，乘倒數後截斷即為取整；& 3 讓 >157.5° 繞回水平線（無分支）
+    bins = ((angles + 22.5) * (1.0 / 45.0)).astype(np.int64) & 3
+    angle_counts = dict(zip((0, 45, 90, 135), np.bincount(bins, minlength=4).tolist()))
     
     if verbose:
         print(f"  線條統計: 水平={angle_counts[0]}, 45°={angle_counts[45]}, " +
               f"垂直={angle_counts[90]}, 135°={angle_counts[135]}")
     
     # 計算文字投影方差來輔助判斷
+    # 旋轉 90°/270° 後的水平投影就是原圖的垂直投影，180° 只是 0° 投影的反序（方差相同），
+    # 因此不必實際旋轉圖像，在原圖遮罩上做行、列兩個方向的投影即可
+    text_mask = cv2.threshold(gray, 199, 1, cv2.THRESH_BINARY_INV)[1]  # 灰度 < 200 為 1
+    horizontal_projection = cv2.reduce(text_mask, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+    vertical_projection = cv2.reduce(text_mask, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+    projection_variances = {
+        0: np.var(horizontal_projection),   # 0° / 180°
+        90: np.var(vertical_projection)     # 90° / 270°
+    }
+    
     scores = {}
     for test_angle in [0, 90, 180, 270]:
-        rotated = rotate_image(image.copy(), test_angle)
-        rotated_gray = cv2.cvtColor(rotated, cv2.COLOR_BGR2GRAY) if len(rotated.shape) == 3 else rotated
-        
         # 計算水平投影方差（文字行應該產生高方差）
-        horizontal_projection = np.sum(rotated_gray < 200, axis=1)
-        variance = np.var(horizontal_projection)
+        variance = projection_variances[test_angle % 180]
         
         # 結合線條數量和投影方差
         line_score = angle_counts.get((test_angle % 180), 0)
@@ -99,39 +190,35 @@ def visualize_line_detection(image: np.ndarray, output_path: str, degree_limit:
         degree_limit: 角度限制（例如 10 表示只顯示 ±10° 內的線條），None 表示顯示全部
     """
     result = image.copy()
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image.copy()
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
     
-    # 邊緣檢測
-    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    # 邊緣檢測 + 霍夫直線檢測
+    lines = detect_line_segments(gray)
     
-    # 霍夫直線檢測
-    lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=100, minLineLength=50, maxLineGap=10)
+    filtered_lines = []
     
     if lines is not None:
-        # 儲存所有角度和過濾後的線條
-        all_angles = []
-        filtered_lines = []
-        filtered_angles = []
+        # 一次計算所有線條的角度（向量化，避免逐條迴圈）
+        segments = lines.reshape(-1, 4)
+        all_angles = np.arctan2(segments[:, 3] - segments[:, 1],
+                                segments[:, 2] - segments[:, 0]) * 180 / np.pi
         
-        # 計算所有線條的角度
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            angle = np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi
-            all_angles.append(angle)
-            
-            # 判斷是否在角度範圍內
-            if degree_limit is None or abs(angle) <= degree_limit:
-                filtered_lines.append(line[0])
-                filtered_angles.append(angle)
+        # 判斷是否在角度範圍內
+        if degree_limit is None:
+            filtered_lines = segments
+            filtered_angles = all_angles
+        else:
+            in_range = np.abs(all_angles) <= degree_limit
+            filtered_lines = segments[in_range]
+            filtered_angles = all_angles[in_range]
         
         print(f"  檢測到 {len(lines)} 條線")
         if degree_limit is not None:
             print(f"  符合角度範圍 (±{degree_limit}°) 的線: {len(filtered_lines)} 條")
         
-        # 繪製過濾後的線條
-        for line_coords in filtered_lines:
-            x1, y1, x2, y2 = line_coords
-            cv2.line(result, (x1, y1), (x2, y2), (0, 0, 255), 2)
+        # 繪製過濾後的線條（每條線段視為兩點的開放折線，一次呼叫畫完）
+        if len(filtered_lines) > 0:
+            cv2.polylines(result, filtered_lines.reshape(-1, 2, 2), False, (0, 0, 255), 2)
         
         # 顯示詳細信息
         if len(filtered_lines) > 0:
@@ -139,25 +226,23 @@ def visualize_line_detection(image: np.ndarray, output_path: str, degree_limit:
             print(f"  {'序號':<6} {'起點':<15} {'終點':<15} {'角度':<10}")
             print(f"  {'-'*50}")
             
-            for idx, (line_coords, angle) in enumerate(zip(filtered_lines, filtered_angles), 1):
+            # 只顯示前 20 條詳細信息
+            for idx, (line_coords, angle) in enumerate(zip(filtered_lines[:20], filtered_angles[:20]), 1):
                 x1, y1, x2, y2 = line_coords
-                
-                # 只顯示前 20 條詳細信息
-                if idx <= 20:
-                    print(f"  {idx:<6} ({x1:>3},{y1:>3}) -> ({x2:>3},{y2:>3})  {angle:>6.2f}°")
+                print(f"  {idx:<6} ({x1:>3},{y1:>3}) -> ({x2:>3},{y2:>3})  {angle:>6.2f}°")
             
             if len(filtered_lines) > 20:
                 print(f"  ... (省略剩餘 {len(filtered_lines)-20} 條線)")
             
             # 統計過濾後的角度分布
-            angles_array = np.array(filtered_angles)
+            angles_array = filtered_angles
             
             # 計算最多出現的角度（眾數）
-            # 將角度四捨五入到 0.1 度來統計
-            rounded_angles = np.round(angles_array, 1)
-            unique_angles, counts = np.unique(rounded_angles, return_counts=True)
+            # 將角度四捨五入到 0.1 度，以整數區間計數（角度範圍 ±180°，共 3601 個區間）
+            angle_bins = np.rint(angles_array * 10).astype(np.int64) + 1800
+            counts = np.bincount(angle_bins, minlength=3601)
             most_common_idx = np.argmax(counts)
-            most_common_angle = unique_angles[most_common_idx]
+            most_common_angle = (most_common_idx - 1800) / 10
             most_common_count = counts[most_common_idx]
             
             print(f"\n  過濾後角度統計:")
@@ -173,7 +258,7 @@ def visualize_line_detection(image: np.ndarray, output_path: str, degree_limit:
         
         # 顯示全部線條的統計
         if degree_limit is not None and len(all_angles) > 0:
-            all_angles_array = np.array(all_angles)
+            all_angles_array = all_angles
             print(f"\n  全部線條角度統計（參考）:")
             print(f"  {'最小角度:':<15} {np.min(all_angles_array):>6.2f}°")
             print(f"  {'最大角度:':<15} {np.max(all_angles_array):>6.2f}°")
@@ -195,6 +280,31 @@ def visualize_line_detection(image: np.ndarray, output_path: str, degree_limit:
         return result, None
 
 
+def bresenham_line(x0: int, y0: int, x1: int, y1: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bresenham 直線演算法的向量化版本（閉式解，不逐點迴圈）
+    
+    沿主軸每步前進 1 像素，副軸位移為 i*d_minor/d_major 四捨五入（剛好一半時捨去），
+    與逐點迭代的 Bresenham（err = dx - dy）產生完全相同的點序列
+    
+    返回:
+        xs, ys: 從 (x0, y0) 到 (x1, y1)（含端點）依序的像素座標
+    """
+    dx_line = abs(x1 - x0)
+    dy_line = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    
+    major = max(dx_line, dy_line)
+    minor = min(dx_line, dy_line)
+    steps = np.arange(major + 1, dtype=np.int64)
+    minor_steps = (2 * steps * minor + major - 1) // (2 * major) if major > 0 else steps
+    
+    if dx_line >= dy_line:
+        return x0 + sx * steps, y0 + sy * minor_steps
+    return x0 + sx * minor_steps, y0 + sy * steps
+
+
 def detect_blank_separators(image: np.ndarray, angle: float, output_path: str = None, 
                            angle_tolerance: float = 5.0, 
                            scan_step: int = 5,
@@ -221,9 +331,8 @@ def detect_blank_separators(image: np.ndarray, angle: float, output_path: str =
     print(f"  最小空白長度: {min_blank_length} 像素")
     print(f"  白色閾值: {white_threshold}")
     
-    result = image.copy()  # 用於繪製掃描線（紅色）+ 空白線（綠色）
-    result_clean = image.copy()  # 用於只繪製空白線（綠色）
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image.copy()
+    # 灰階圖只讀取不修改，不需複製；繪圖用的副本等到要儲存時才建立
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
     h, w = gray.shape
     
     blank_regions = []
@@ -263,45 +372,19 @@ def detect_blank_separators(image: np.ndarray, angle: float, output_path: str =
         line_end_x = int(scan_center_x + diag * dx)
         line_end_y = int(scan_center_y + diag * dy)
         
-        # 使用 Bresenham 算法獲取掃描線上的像素
-        points = []
-        x0, y0 = line_start_x, line_start_y
-        x1, y1 = line_end_x, line_end_y
-        
-        # Bresenham's line algorithm
-        dx_line = abs(x1 - x0)
-        dy_line = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx_line - dy_line
-        
-        x, y = x0, y0
-        while True:
-            if 0 <= x < w and 0 <= y < h:
-                points.append((x, y))
-            
-            if x == x1 and y == y1:
-                break
-                
-            e2 = 2 * err
-            if e2 > -dy_line:
-                err -= dy_line
-                x += sx
-            if e2 < dx_line:
-                err += dx_line
-                y += sy
+        # 使用 Bresenham 算法獲取掃描線上的像素，只保留圖像範圍內的點
+        xs, ys = bresenham_line(line_start_x, line_start_y, line_end_x, line_end_y)
+        inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        xs, ys = xs[inside], ys[inside]
         
-        if len(points) > 0:
-            # 記錄掃描線用於繪製
-            if len(points) >= 2:
-                start_pt = points[0]
-                end_pt = points[-1]
-                scanned_lines.append({
-                    'x1': start_pt[0], 'y1': start_pt[1],
-                    'x2': end_pt[0], 'y2': end_pt[1],
-                    'offset': offset,
-                    'points': points  # 保存所有像素點
-                })
+        # 記錄掃描線用於繪製
+        if len(xs) >= 2:
+            scanned_lines.append({
+                'x1': int(xs[0]), 'y1': int(ys[0]),
+                'x2': int(xs[-1]), 'y2': int(ys[-1]),
+                'offset': offset,
+                'xs': xs, 'ys': ys  # 保存所有像素點
+            })
     
     print(f"  完成 {len(scanned_lines)} 條掃描線")
     
@@ -324,42 +407,32 @@ def detect_blank_separators(image: np.ndarray, angle: float, output_path: str =
     total_scanned_pixels = 0  # 統計所有掃描到的點總數
     
     for scan_line in scanned_lines:
-        points = scan_line['points']
-        if len(points) == 0:
-            continue
-        
-        # 獲取這條掃描線上的所有像素值
-        pixel_values = [gray[y, x] for x, y in points]
+        # 獲取這條掃描線上的所有像素值（一次索引取出）
+        pixel_values = gray[scan_line['ys'], scan_line['xs']]
         
         # 統計總點數和白色點數
-        total_scanned_pixels += len(pixel_values)
-        white_pixels_in_line = sum(1 for pv in pixel_values if pv >= white_threshold)
-        total_white_pixels += white_pixels_in_line
+        total_scanned_pixels += pixel_values.size
+        total_white_pixels += int(np.count_nonzero(pixel_values >= white_threshold))
         
         # 檢查整條線是否都沒有黑點（所有像素都 >= 220）
-        min_pixel = min(pixel_values)
-        
-        if min_pixel < 220:
+        if pixel_values.min() < 220:
             # 這條線上有黑點（文字），跳過
             filtered_by_dark_pixels += 1
             continue
         
         # 這條線完全乾淨，記錄為空白區域
-        if len(points) >= 2:
-            start_pt = points[0]
-            end_pt = points[-1]
-            segment_length = int(np.sqrt((end_pt[0]-start_pt[0])**2 + 
-                                         (end_pt[1]-start_pt[1])**2))
-            
-            blank_regions.append({
-                'type': 'angled',
-                'angle': angle,
-                'x1': start_pt[0],
-                'y1': start_pt[1],
-                'x2': end_pt[0],
-                'y2': end_pt[1],
-                'length': segment_length
-            })
+        x1, y1, x2, y2 = scan_line['x1'], scan_line['y1'], scan_line['x2'], scan_line['y2']
+        segment_length = int(np.sqrt((x2 - x1)**2 + (y2 - y1)**2))
+        
+        blank_regions.append({
+            'type': 'angled',
+            'angle': angle,
+            'x1': x1,
+            'y1': y1,
+            'x2': x2,
+            'y2': y2,
+            'length': segment_length
+        })
     
     print(f"  找到 {len(blank_regions)} 個空白區段")
     print(f"  過濾掉 {filtered_by_dark_pixels} 個有黑點的掃描線")
@@ -374,16 +447,21 @@ def detect_blank_separators(image: np.ndarray, angle: float, output_path: str =
         print(f"  空白區段 Y 坐標範圍: {y_coords.min()} - {y_coords.max()}")
         print(f"  Y > 300 的區段數: {np.sum(y_coords > 300)}/{len(y_coords)}")
     
-    # 先建立只有綠線的版本
-    result_clean = image.copy()
+    # 有輸出路徑時才建立兩個繪圖版本：
+    # result 繪製掃描線（紅色）+ 空白線（綠色），result_clean 只繪製空白線（綠色）
+    draw = bool(output_path)
+    if draw:
+        result = image.copy()
+        result_clean = image.copy()
     
     # 繪製掃描過的線（紅色）- 在原圖上
-    print(f"  繪製 {len(scanned_lines)} 條掃描線（紅色標記）")
-    for scan_line in scanned_lines:
-        cv2.line(result, 
-                (scan_line['x1'], scan_line['y1']), 
-                (scan_line['x2'], scan_line['y2']), 
-                (0, 0, 255), 2)  # 紅色，粗線（改為2像素）
+    if draw:
+        print(f"  繪製 {len(scanned_lines)} 條掃描線（紅色標記）")
+        for scan_line in scanned_lines:
+            cv2.line(result, 
+                    (scan_line['x1'], scan_line['y1']), 
+                    (scan_line['x2'], scan_line['y2']), 
+                    (0, 0, 255), 2)  # 紅色，粗線（改為2像素）
     
     # 繪製檢測到的空白線
     print(f"\n  檢測到 {len(blank_regions)} 個空白分隔區域")
@@ -391,14 +469,15 @@ def detect_blank_separators(image: np.ndarray, angle: float, output_path: str =
     # 繪製所有空白區域（都是 angled 類型）
     for idx, blank in enumerate(blank_regions, 1):
         # 空白線用綠色標記（在兩個版本上都畫）
-        cv2.line(result, 
-                (blank['x1'], blank['y1']), 
-                (blank['x2'], blank['y2']), 
-                (0, 255, 0), 2)
-        cv2.line(result_clean, 
-                (blank['x1'], blank['y1']), 
-                (blank['x2'], blank['y2']), 
-                (0, 255, 0), 2)
+        if draw:
+            cv2.line(result, 
+                    (blank['x1'], blank['y1']), 
+                    (blank['x2'], blank['y2']), 
+                    (0, 255, 0), 2)
+            cv2.line(result_clean, 
+                    (blank['x1'], blank['y1']), 
+                    (blank['x2'], blank['y2']), 
+                    (0, 255, 0), 2)
         if idx <= 20:  # 只打印前20條
             print(f"  {idx}. 空白區 ({blank['angle']:.1f}°) from ({blank['x1']},{blank['y1']}) to ({blank['x2']},{blank['y2']}), 長度={blank['length']}px")
     
@@ -406,7 +485,7 @@ def detect_blank_separators(image: np.ndarray, angle: float, output_path: str =
         print(f"  ... (省略剩餘 {len(blank_regions)-20} 個的打印輸出)")
     
     # 儲存兩個版本的結果
-    if output_path:
+    if draw:
         # 版本1: 只有綠色空白線
         blank_path_clean = output_path.replace('.', '_blanks.')
         cv2.imwrite(blank_path_clean, result_clean)
@@ -495,10 +574,36 @@ def auto_rotate_by_content(image: np.ndarray, verbose: bool = False) -> Tuple[np
     return rotated, rotation_angle
 
 
-def preprocess_image(image: np.ndarray, enable_rotation: bool = True, verbose: bool = False) -> Tuple[np.ndarray, int]:
+def denoise_image(image: np.ndarray, method: str = 'bilateral') -> np.ndarray:
+    """
+    彩色圖像降噪
+    
+    Args:
+        image: BGR 圖像
+        method: 'bilateral' 雙邊濾波（保留文字邊緣，速度遠快於 NL-means）、
+                'nlm' 原本的 fastNlMeansDenoisingColored、
+                'gpu' CUDA 版 NL-means（沒有 CUDA 時改用 CPU 的 NL-means）
+    """
+    if method == 'bilateral':
+        return cv2.bilateralFilter(image, 5, 50, 50)
+    if method == 'gpu' and USE_CUDA:
+        gpu_image = cv2.cuda_GpuMat()
+        gpu_image.upload(image)
+        return cv2.cuda.fastNlMeansDenoisingColored(gpu_image, 10, 10,
+                                                    search_window=21, block_size=7).download()
+    if method in ('nlm', 'gpu'):
+        return cv2.fastNlMeansDenoisingColored(image, None, 10, 10, 7, 21)
+    raise ValueError(f"未知的降噪方法: {method}")
+
+
+def preprocess_image(image: np.ndarray, enable_rotation: bool = True, verbose: bool = False,
+                     denoise: str = 'bilateral') -> Tuple[np.ndarray, int]:
     """
     完整的圖像預處理流程
     
+    Args:
+        denoise: 降噪方法（見 denoise_image）
+    
     返回:
         processed_image: 處理後的圖像
         rotation_angle: 旋轉的角度
@@ -512,8 +617,8 @@ def preprocess_image(image: np.ndarray, enable_rotation: bool = True, verbose: b
     # 2. 降噪
     if verbose:
         print("\n=== 圖像增強 ===")
-        print("  應用降噪...")
-    image = cv2.fastNlMeansDenoisingColored(image, None, 10, 10, 7, 21)
+        print(f"  應用降噪 ({denoise})...")
+    image = denoise_image(image, denoise)
     
     # 3. 灰階轉換
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -521,16 +626,12 @@ def preprocess_image(image: np.ndarray, enable_rotation: bool = True, verbose: b
     # 4. 對比度增強
     if verbose:
         print("  增強對比度...")
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
+    enhanced = CLAHE.apply(gray)
     
     # 5. 銳化
     if verbose:
         print("  應用銳化...")
-    kernel = np.array([[-1, -1, -1],
-                      [-1,  9, -1],
-                      [-1, -1, -1]])
-    sharpened = cv2.filter2D(enhanced, -1, kernel)
+    sharpened = cv2.filter2D(enhanced, -1, SHARPEN_KERNEL)
     
     # 轉回彩色以便後續處理
     result = cv2.cvtColor(sharpened, cv2.COLOR_GRAY2BGR)
@@ -541,10 +642,85 @@ def preprocess_image(image: np.ndarray, enable_rotation: bool = True, verbose: b
     return result, rotation_angle
 
 
+def list_images(input_dir: str) -> List[str]:
+    """列出目錄中的圖像檔案（單次 scandir，依檔名排序）"""
+    with os.scandir(input_dir) as entries:
+        return sorted(entry.path for entry in entries
+                      if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def process_one(input_path: str, output_path: str, enable_rotation: bool = True,
+                denoise: str = 'bilateral', verbose: bool = False) -> Tuple[str, Optional[int]]:
+    """
+    預處理單張圖像並儲存（批次模式的工作單元）
+    
+    返回:
+        input_path: 輸入路徑
+        rotation_angle: 旋轉的角度，無法讀取圖像時為 None
+    """
+    image = cv2.imread(input_path)
+    if image is None:
+        print(f"錯誤: 無法讀取圖像 {input_path}")
+        return input_path, None
+    
+    processed, rotation_angle = preprocess_image(image, enable_rotation=enable_rotation,
+                                                 verbose=verbose, denoise=denoise)
+    cv2.imwrite(output_path, processed)
+    return input_path, rotation_angle
+
+
+def process_directory(input_dir: str, output_dir: str, workers: int,
+                      enable_rotation: bool = True, denoise: str = 'bilateral') -> None:
+    """
+    以多程序批次預處理目錄中的所有圖像
+    
+    Args:
+        input_dir: 輸入目錄
+        output_dir: 輸出目錄（沿用原檔名）
+        workers: 程序數
+        enable_rotation: 是否自動旋轉
+        denoise: 降噪方法（見 denoise_image）
+    """
+    image_files = list_images(input_dir)
+    if not image_files:
+        print(f"錯誤: {input_dir} 中沒有圖像檔案")
+        return
+    
+    # 輸出沿用原檔名，輸出目錄與輸入目錄相同時會覆蓋原始圖像
+    if os.path.isdir(output_dir) and os.path.samefile(input_dir, output_dir):
+        print(f"錯誤: 輸出目錄不可與輸入目錄相同 ({output_dir})")
+        return
+    
+    os.makedirs(output_dir, exist_ok=True)
+    output_files = [os.path.join(output_dir, os.path.basename(f)) for f in image_files]
+    
+    print(f"批次處理 {len(image_files)} 張圖像（{workers} 個程序）...")
+    
+    # 每個程序只用單執行緒 OpenCV，避免與程序平行互相搶核心
+    # 使用 spawn 而非 fork：模組載入時已初始化 CUDA / OpenCL，fork 出的子程序無法再使用
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=cv2.setNumThreads, initargs=(1,)) as executor:
+        results = executor.map(process_one, image_files, output_files,
+                               repeat(enable_rotation), repeat(denoise))
+        for input_path, rotation_angle in results:
+            if rotation_angle is not None:
+                print(f"  {os.path.basename(input_path)}: 旋轉 {rotation_angle}°")
+    
+    print(f"已儲存至: {output_dir}")
+
+
+def positive_int(value: str) -> int:
+    """argparse 用：正整數參數"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"必須是正整數: {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(description='霍夫直線檢測預處理工具')
-    parser.add_argument('--input', '-i', required=True, help='輸入圖像路徑')
-    parser.add_argument('--output', '-o', required=True, help='輸出圖像路徑')
+    parser.add_argument('--input', '-i', required=True, help='輸入圖像路徑（或圖像目錄，批次處理）')
+    parser.add_argument('--output', '-o', required=True, help='輸出圖像路徑（批次處理時為輸出目錄）')
     parser.add_argument('--show-lines', action='store_true', help='顯示檢測到的線條（紅色標記）')
     parser.add_argument('--degree', type=float, help='限定畫出紅線的角度範圍（例如：--degree 10 只畫出 ±10° 內的線條）')
     parser.add_argument('--detect-blanks', action='store_true', help='檢測空白分隔線（綠色標記）')
@@ -554,10 +730,32 @@ def main():
     parser.add_argument('--min-blank', type=int, default=30, help='最小空白長度（像素，預設：30）')
     parser.add_argument('--white-threshold', type=int, default=240, help='白色閾值（0-255，預設：240）')
     parser.add_argument('--no-rotation', action='store_true', help='停用自動旋轉')
+    parser.add_argument('--denoise', choices=DENOISE_METHODS, default='bilateral',
+                        help='降噪方法：bilateral 雙邊濾波（預設）、nlm 原本的 NL-means（較慢）、gpu CUDA NL-means')
+    parser.add_argument('--workers', type=positive_int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help='批次處理的程序數（預設：CPU 核心數的一半）')
     parser.add_argument('--verbose', '-v', action='store_true', help='顯示詳細輸出')
     
     args = parser.parse_args()
     
+    # 批次模式：輸入為目錄
+    if os.path.isdir(args.input):
+        single_image_options = [name for name, used in [
+            ('--show-lines', args.show_lines),
+            ('--degree', args.degree is not None),
+            ('--detect-blanks', args.detect_blanks),
+            ('--scan-angle', args.scan_angle is not None),
+            ('--angle-offset', args.angle_offset is not None),
+        ] if used]
+        if single_image_options:
+            print(f"錯誤: {', '.join(single_image_options)} 只支援單張圖像")
+            return
+        if args.verbose:
+            print("警告: 批次模式不輸出每張圖像的詳細資訊，忽略 --verbose")
+        process_directory(args.input, args.output, args.workers,
+                          enable_rotation=not args.no_rotation, denoise=args.denoise)
+        return
+    
     # 讀取圖像
     if not os.path.exists(args.input):
         print(f"錯誤: 找不到輸入檔案 {args.input}")
@@ -667,7 +865,8 @@ def main():
     processed, rotation_angle = preprocess_image(
         image, 
         enable_rotation=not args.no_rotation,
-        verbose=args.verbose
+        verbose=args.verbose,
+        denoise=args.denoise
     )
     
     # 儲存結果
@@ -7,13 +7,52 @@ OCR 表單識別工具
 """
 
 import argparse
+import importlib.util
 import json
 import os
+import sys
 from pathlib import Path
-from paddleocr import PaddleOCR
 import cv2
 import numpy as np
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Union
+
+
+# 本專案目錄與上層目錄（其他預處理專案所在位置）
+OCR_TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECTS_DIR = os.path.dirname(OCR_TOOL_DIR)
+
+
+def _load_project_module(project_dir: str, module_name: str):
+    """
+    從其他預處理專案目錄載入模組，不修改 sys.path
+    
+    優先載入 ../<project_dir>/<module_name>.py，找不到時使用複製到本目錄的版本
+    
+    Raises:
+        ImportError: 兩個位置都找不到模組檔案
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    
+    candidates = [
+        os.path.join(PROJECTS_DIR, project_dir, f"{module_name}.py"),
+        os.path.join(OCR_TOOL_DIR, f"{module_name}.py"),
+    ]
+    module_path = next((path for path in candidates if os.path.exists(path)), None)
+    if module_path is None:
+        raise ImportError(f"找不到模組: {module_name}")
+    
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    # 先註冊，讓模組內部的同層 import（如 rotation_detector）可以找到
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    
+    return module
 
 
 class OCRParser:
@@ -35,6 +74,9 @@ class OCRParser:
         if verbose:
             print(f"正在初始化 PaddleOCR（語言: {lang}, GPU: {use_gpu}）...")
         
+        # 延遲導入：PaddleOCR 載入耗時，--help 或參數錯誤時不需付出此成本
+        from paddleocr import PaddleOCR
+        
         # 根據敏感度設置參數
         if high_sensitivity:
             det_db_thresh = 0.2
@@ -58,21 +100,27 @@ class OCRParser:
         if verbose:
             print("✓ PaddleOCR 初始化完成")
     
-    def recognize(self, image_path: str) -> Dict[str, Any]:
+    def recognize(self, image: Union[str, np.ndarray]) -> Dict[str, Any]:
         """
         識別圖像中的文字
         
+        Args:
+            image: 圖像路徑，或已在記憶體中的 BGR 圖像陣列
+        
         Returns:
             結果字典，包含識別的文字和位置
         """
-        if not os.path.exists(image_path):
-            return {"success": False, "error": f"找不到檔案: {image_path}"}
-        
-        if self.verbose:
-            print(f"\n正在識別: {image_path}")
+        if isinstance(image, str):
+            if not os.path.exists(image):
+                return {"success": False, "error": f"找不到檔案: {image}"}
+            
+            if self.verbose:
+                print(f"\n正在識別: {image}")
+        elif self.verbose:
+            print(f"\n正在識別: 預處理後圖像 ({image.shape[1]}x{image.shape[0]})")
         
         # OCR 識別
-        result = self.ocr.ocr(image_path, cls=True)
+        result = self.ocr.ocr(image, cls=True)
         
         if not result or not result[0]:
             return {
@@ -140,19 +188,33 @@ class OCRParser:
             print(f"✓ 可視化結果已儲存至: {output_path}")
 
 
-def preprocess_with_method(image_path: str, method: str, model_path: str = None, 
-                          verbose: bool = False) -> Tuple[str, float]:
+def save_preprocessed_image(image_path: str, processed: np.ndarray) -> str:
     """
-    使用指定方法預處理圖像
+    將預處理後（實際交給 OCR）的圖像存到輸入圖像旁的 .preprocessed/ 目錄，供檢查用
     
     Returns:
-        (processed_path, rotation_angle)
+        儲存的檔案路徑
     """
     temp_dir = os.path.join(os.path.dirname(image_path), ".preprocessed")
     os.makedirs(temp_dir, exist_ok=True)
     
     output_path = os.path.join(temp_dir, f"preprocessed_{os.path.basename(image_path)}")
+    cv2.imwrite(output_path, processed)
+    return output_path
+
+
+def preprocess_with_method(image_path: str, method: str, model_path: str = None, 
+                          verbose: bool = False) -> Tuple[Union[str, np.ndarray], float]:
+    """
+    使用指定方法預處理圖像
     
+    處理後的圖像直接以陣列返回交給 OCR，不再寫入暫存檔後重新讀取
+    （需要檢查處理結果時用 save_preprocessed_image 另存）
+    
+    Returns:
+        (processed_image, rotation_angle)
+        processed_image 為處理後的圖像陣列；未預處理時為原始圖像路徑
+    """
     if method == 'hough':
         # 使用霍夫直線檢測
         if verbose:
@@ -160,15 +222,12 @@ def preprocess_with_method(image_path: str, method: str, model_path: str = None,
         
         try:
             # 嘗試導入模組
-            import sys
-            sys.path.insert(0, '../1_Hough_Line_Detection')
-            from preprocess_hough import preprocess_image
+            preprocess_image = _load_project_module(
+                '1_Hough_Line_Detection', 'preprocess_hough').preprocess_image
             
             image = cv2.imread(image_path)
             processed, angle = preprocess_image(image, enable_rotation=True, verbose=verbose)
-            cv2.imwrite(output_path, processed)
-            
-            return output_path, angle
+            return processed, angle
         except ImportError:
             print("警告: 找不到霍夫直線檢測模組，使用原始圖像")
             return image_path, 0.0
@@ -179,16 +238,13 @@ def preprocess_with_method(image_path: str, method: str, model_path: str = None,
             print("使用 PCA 預處理...")
         
         try:
-            import sys
-            sys.path.insert(0, '../2_Scikit_Learn_PCA')
-            from preprocess_pca import preprocess_image
+            preprocess_image = _load_project_module(
+                '2_Scikit_Learn_PCA', 'preprocess_pca').preprocess_image
             
             image = cv2.imread(image_path)
             processed, angle = preprocess_image(image, enable_rotation=True, 
                                                verbose=verbose, debug=False)
-            cv2.imwrite(output_path, processed)
-            
-            return output_path, angle
+            return processed, angle
         except ImportError:
             print("警告: 找不到 PCA 模組，使用原始圖像")
             return image_path, 0.0
@@ -199,16 +255,15 @@ def preprocess_with_method(image_path: str, method: str, model_path: str = None,
             print("使用深度學習預處理...")
         
         try:
-            import sys
-            sys.path.insert(0, '../3_MobileNetV3_DL')
-            from preprocess_dl import preprocess_image
+            # preprocess_dl 會以 `from rotation_detector import ...` 載入同層模組
+            _load_project_module('3_MobileNetV3_DL', 'rotation_detector')
+            preprocess_image = _load_project_module(
+                '3_MobileNetV3_DL', 'preprocess_dl').preprocess_image
             
             image = cv2.imread(image_path)
             processed, angle = preprocess_image(image, model_path=model_path, 
                                                enable_rotation=True, verbose=verbose)
-            cv2.imwrite(output_path, processed)
-            
-            return output_path, angle
+            return processed, angle
         except ImportError:
             print("警告: 找不到深度學習模組，使用原始圖像")
             return image_path, 0.0
@@ -232,20 +287,28 @@ def main():
     parser.add_argument('--method', choices=['hough', 'pca', 'dl'], default='pca',
                        help='預處理方法')
     parser.add_argument('--model', help='深度學習模型路徑（method=dl 時使用）')
+    parser.add_argument('--save-preprocessed', action='store_true',
+                       help='另存預處理後的圖像至輸入圖像旁的 .preprocessed/ 目錄')
     parser.add_argument('--verbose', action='store_true', help='詳細輸出')
     
     args = parser.parse_args()
     
     # 預處理
-    image_path = args.image
+    ocr_input = args.image
     rotation_angle = 0.0
     preprocessing_method = 'none'
     
     if args.preprocess:
         preprocessing_method = args.method
-        image_path, rotation_angle = preprocess_with_method(
+        ocr_input, rotation_angle = preprocess_with_method(
             args.image, args.method, args.model, args.verbose
         )
+        
+        # OCR 直接使用記憶體中的圖像；需要時另存一份供檢查
+        if args.save_preprocessed and isinstance(ocr_input, np.ndarray):
+            saved_path = save_preprocessed_image(args.image, ocr_input)
+            if args.verbose:
+                print(f"✓ 預處理圖像已儲存至: {saved_path}")
     
     # OCR 識別
     ocr_parser = OCRParser(
@@ -255,7 +318,7 @@ def main():
         verbose=args.verbose
     )
     
-    result = ocr_parser.recognize(image_path)
+    result = ocr_parser.recognize(ocr_input)
     
     # 添加預處理資訊
     result["rotation_angle"] = rotation_angle